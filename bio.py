@@ -17,12 +17,13 @@ Author: generated for Tizzy Whizzy
 """
 
 import curses
+import os
 import time
 import random
 import argparse
 import textwrap
 import sys
-from itertools import cycle
+import unicodedata
 
 # -----------------------
 # Customizable Bio Lines
@@ -37,6 +38,12 @@ BIO_LINES = [
 
 # Characters used in matrix rain
 MATRIX_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789@#$%&*+-/\\|()[]{}<>"
+# byte -> MATRIX_CHARS byte table, so random bytes map to rain chars in one translate()
+CHAR_POOL = MATRIX_CHARS.encode("ascii")
+CHAR_TABLE = bytes(CHAR_POOL[i % len(CHAR_POOL)] for i in range(256))
+
+# Private generator for the rain; draws are batched per reset
+RNG = random.Random()
 
 # Colors we'll cycle through for the bio text (curses color constants)
 COLOR_CYCLE = [
@@ -49,6 +56,23 @@ COLOR_CYCLE = [
     curses.COLOR_WHITE,
 ]
 
+# Color lookup tables are padded to a power of two (repeating the first
+# colors) so a running counter picks its entry with `& COLOR_MASK`
+COLOR_SLOTS = 8
+COLOR_MASK = COLOR_SLOTS - 1
+
+# Attribute lookup tables, filled in by init_colors() once curses is up
+TEXT_ATTRS = []      # bold color per color slot, for the typed bio
+OVERLAY_ATTRS = []   # plain color per color slot, for the static overlay
+MATRIX_ATTRS = []    # [tail, head] attributes for the matrix rain
+SGR_CACHE = {}       # curses attribute -> ANSI SGR bytes, for --direct-tty
+
+# Main loop frame budget in seconds (~33 fps)
+FRAME_TIME = 0.03
+
+# Frames to hold each color phase of the static bio overlay
+OVERLAY_CYCLE_FRAMES = 4
+
 # -----------------------
 # Core functions
 # -----------------------
@@ -57,6 +81,7 @@ def init_colors():
     Initialize color pairs for text cycling and for the matrix drops.
     Pair 1..n for text; pair 50 used for bright green matrix head,
     pair 51 for dim green tail (if terminal supports).
+    Also fills the TEXT_ATTRS / OVERLAY_ATTRS / MATRIX_ATTRS lookup tables.
     """
     curses.start_color()
     curses.use_default_colors()
@@ -75,132 +100,346 @@ def init_colors():
     except Exception:
         pass
 
+    # precompute attributes so hot loops only index a list
+    pairs = [i % len(COLOR_CYCLE) + 1 for i in range(COLOR_SLOTS)]
+    TEXT_ATTRS[:] = [curses.color_pair(p) | curses.A_BOLD for p in pairs]
+    OVERLAY_ATTRS[:] = [curses.color_pair(p) for p in pairs]
+    MATRIX_ATTRS[:] = [curses.color_pair(51), curses.color_pair(50) | curses.A_BOLD]
+
 
-class MatrixColumn:
-    """Represents one column of falling characters."""
-    def __init__(self, x, height):
-        self.x = x
+class MatrixField:
+    """
+    All falling columns of the rain, stored as parallel lists indexed by
+    column number (x, y, speed, ...) instead of one object per column, so a
+    frame update is one loop over plain lists. The characters of all columns
+    share one bytearray; column c owns chars[c * buf_len:(c + 1) * buf_len].
+    """
+    def __init__(self, xs, height, now):
         self.height = height
-        self.reset()
-
-    def reset(self):
-        self.y = random.randint(-self.height // 2, 0)
-        self.speed = random.uniform(0.05, 0.4)  # seconds per step
-        self.length = random.randint(4, max(6, self.height // 6))
-        self.last_step = time.time()
-        # pre-generate characters for the column
-        self.chars = [random.choice(MATRIX_CHARS) for _ in range(self.height + self.length + 10)]
-
-    def step(self):
-        now = time.time()
-        if now - self.last_step >= self.speed:
-            self.y += 1
-            self.last_step = now
-            # sometimes reset when a column has gone off screen
-            if self.y - self.length > self.height + random.randint(0, self.height):
-                self.reset()
-
-    def get_positions(self):
-        """Return list of (y_pos, char, is_head) for currently visible chars."""
-        res = []
-        for i in range(self.length):
-            pos = self.y - i
-            if 0 <= pos < self.height:
-                char = self.chars[(self.y + i) % len(self.chars)]
-                is_head = (i == 0)
-                res.append((pos, char, is_head))
-        return res
+        self.xs = list(xs)
+        n = len(self.xs)
+        self.ys = [0] * n
+        self.speeds = [0.0] * n
+        self.lengths = [0] * n
+        self.last_steps = [0.0] * n
+        # room for the longest possible column, as the old per-column lists had
+        self.buf_len = height + max(6, height // 6) + 10
+        self.chars = bytearray(n * self.buf_len)
+        self.reset(range(n), now)
+
+    def reset(self, cs, now):
+        """Respawn the columns listed in cs above the screen with fresh speeds/lengths."""
+        height = self.height
+        k = len(cs)
+        # draw every column's values in a few bulk calls
+        ys = RNG.choices(range(-height // 2, 1), k=k)
+        lengths = RNG.choices(range(4, max(6, height // 6) + 1), k=k)
+        rand = RNG.random
+        # pre-generate characters for all columns at once (as bytes, decoded
+        # when drawn) and reseed each column's slice of the shared buffer in place
+        buf_len = self.buf_len
+        pool = RNG.randbytes(k * buf_len).translate(CHAR_TABLE)
+        chars = self.chars
+        start = 0
+        for c, y, length in zip(cs, ys, lengths):
+            self.ys[c] = y
+            self.speeds[c] = 0.05 + 0.35 * rand()  # seconds per step
+            self.lengths[c] = length
+            self.last_steps[c] = now
+            chars[c * buf_len:(c + 1) * buf_len] = pool[start:start + buf_len]
+            start += buf_len
+
+    def step_all(self, now):
+        """Advance every column that is due; `now` is the frame's shared timestamp."""
+        height = self.height
+        ys, speeds, lengths, last_steps = self.ys, self.speeds, self.lengths, self.last_steps
+        rand = RNG.random
+        gone = []
+        for c in range(len(ys)):
+            if now - last_steps[c] >= speeds[c]:
+                ys[c] += 1
+                last_steps[c] = now
+                # sometimes reset when a column has gone off screen
+                if ys[c] - lengths[c] > height + int(rand() * (height + 1)):
+                    gone.append(c)
+        if gone:
+            self.reset(gone, now)
+
+
+def make_field(height, width, now):
+    """Create the MatrixField for a screen of the given size."""
+    # create columns across the full width with some spacing
+    # (about 12% of columns active -> density control)
+    xs = [x for x in range(0, width) if RNG.random() < 0.12]
 
+    # ensure we have enough columns
+    if not xs:
+        xs = list(range(0, width, max(1, width // 40)))
+    return MatrixField(xs, height, now)
 
-def center_x_for_text(screen_width, text):
-    return max(0, (screen_width - len(text)) // 2)
 
+def char_width(ch):
+    """Terminal cells taken by one character (East Asian wide/fullwidth take two)."""
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+
+def text_width(text):
+    return sum(char_width(ch) for ch in text)
 
-def draw_matrix(stdscr, columns):
-    """Draw the matrix rain given current column states."""
-    height, width = stdscr.getmaxyx()
-    for col in columns:
-        for y, ch, is_head in col.get_positions():
-            try:
-                if is_head:
-                    # bright head
-                    stdscr.addch(y, col.x, ch, curses.color_pair(50) | curses.A_BOLD)
-                else:
-                    # tail: dim or normal
-                    # Use white or default tail falloff by intensity
-                    stdscr.addch(y, col.x, ch, curses.color_pair(51))
-            except curses.error:
-                # off-screen writes can raise; ignore
-                pass
 
+def clip_to_width(text, cells):
+    """Longest prefix of text that fits in the given number of cells."""
+    used = 0
+    for i, ch in enumerate(text):
+        used += char_width(ch)
+        if used > cells:
+            return text[:i]
+    return text
 
-def type_bio_overlay(stdscr, bio_lines, color_cycle_iter, word_delay=0.28, char_delay=0.02):
+
+def center_x_for_text(screen_width, text):
+    return max(0, (screen_width - text_width(text)) // 2)
+
+
+def sgr_bytes(attr):
+    """ANSI SGR sequence selecting the bold flag and foreground of a curses attribute."""
+    seq = SGR_CACHE.get(attr)
+    if seq is None:
+        pair = curses.pair_number(attr)
+        fg = curses.pair_content(pair)[0] if pair else -1
+        codes = "0;1" if attr & curses.A_BOLD else "0"
+        if fg < 0:
+            codes += ";39"
+        elif fg < 8:
+            codes += ";3%d" % fg
+        else:
+            codes += ";38;5;%d" % fg
+        seq = SGR_CACHE[attr] = ("\x1b[%sm" % codes).encode("ascii")
+    return seq
+
+
+class FrameBuffer:
     """
-    Types the bio word-by-word centered on the screen. Each word cycles color.
-    We overlay this on top of the matrix.
+    Off-screen copy of one frame: a character and an attribute per cell,
+    as one list per row. compose_frame() fills it; flush() then compares it with a
+    shadow copy of what is already on screen and only rewrites the changed
+    runs, so the screen never has to be erased.
+    """
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.chars = [[" "] * width for _ in range(height)]
+        self.attrs = [[0] * width for _ in range(height)]
+        self.invalidate()
+
+    def clear(self):
+        blank_chars = [" "] * self.width
+        blank_attrs = [0] * self.width
+        for y in range(self.height):
+            self.chars[y][:] = blank_chars
+            self.attrs[y][:] = blank_attrs
+
+    def invalidate(self):
+        """Forget what is on screen (e.g. something else drew on it); the next flush repaints everything."""
+        self.shown_chars = [[None] * self.width for _ in range(self.height)]
+        self.shown_attrs = [[None] * self.width for _ in range(self.height)]
+
+    def changed_runs(self):
+        """
+        Yield (y, x, text, attr) for every run of changed cells sharing an
+        attribute, and record them as shown. The bottom-right cell is never
+        reported: writing it makes the terminal scroll (and ncurses raise).
+        """
+        height = self.height
+        for y in range(height):
+            width = self.width if y < height - 1 else self.width - 1
+            chars, attrs = self.chars[y], self.attrs[y]
+            shown_chars, shown_attrs = self.shown_chars[y], self.shown_attrs[y]
+            if chars == shown_chars and attrs == shown_attrs:
+                continue
+            x = 0
+            while x < width:
+                if chars[x] == shown_chars[x] and attrs[x] == shown_attrs[x]:
+                    x += 1
+                    continue
+                attr = attrs[x]
+                end = x + 1
+                while end < width and attrs[end] == attr and (
+                        chars[end] != shown_chars[end] or attr != shown_attrs[end]):
+                    end += 1
+                yield y, x, "".join(chars[x:end]), attr
+                x = end
+            shown_chars[:] = chars
+            shown_attrs[:] = attrs
+
+    def flush(self, stdscr):
+        """Write changed cells to stdscr, one addstr per changed run."""
+        for y, x, text, attr in self.changed_runs():
+            stdscr.addstr(y, x, text, attr)
+
+    def flush_tty(self, fd, cursor):
+        """
+        Write changed cells straight to the terminal as ANSI sequences in a
+        single os.write, bypassing curses. Ends with normal attributes and
+        the cursor back at `cursor` (y, x), where curses believes it is.
+        """
+        out = bytearray()
+        for y, x, text, attr in self.changed_runs():
+            out += b"\x1b[%d;%dH" % (y + 1, x + 1)
+            out += sgr_bytes(attr)
+            out += text.encode("utf-8")
+        if not out:
+            return
+        out += b"\x1b[0m\x1b[%d;%dH" % (cursor[0] + 1, cursor[1] + 1)
+        view = memoryview(out)
+        while view:
+            view = view[os.write(fd, view):]
+
+
+def compose_frame(now, field, buf, overlay_cells):
+    """
+    Advance the rain and compose one complete frame into buf: the matrix,
+    then the static overlay on top. This is the per-frame hot path, so it
+    works on local names only and clips each column once by row range
+    instead of testing every cell.
+    """
+    field.step_all(now)
+    buf.clear()
+    height, width = buf.height, buf.width
+    rows_chars, rows_attrs = buf.chars, buf.attrs
+    tail_attr, head_attr = MATRIX_ATTRS
+    chars, n = field.chars, field.buf_len
+    for x, y, length, base in zip(field.xs, field.ys, field.lengths, range(0, len(chars), n)):
+        if x >= width:
+            continue
+        # the column covers rows y-length+1 .. y (head at y)
+        for pos in range(max(0, y - length + 1), min(y, height - 1) + 1):
+            rows_chars[pos][x] = chr(chars[base + (2 * y - pos) % n])
+            rows_attrs[pos][x] = tail_attr
+        if 0 <= y < height:
+            rows_attrs[y][x] = head_attr
+
+    # overlay cells were clipped to this screen size when cached
+    for y, x, ch, attr in overlay_cells:
+        rows_chars[y][x] = ch
+        rows_attrs[y][x] = attr
+
+
+def layout_bio(bio_lines, height, width):
+    """
+    Place the bio centered on a height x width screen. Computed once per
+    screen size and shared by the typing pass and the static overlay.
+    Returns (y, x, chunks) per line; chunks are (text, word_len) pairs where
+    every word after the first carries its separating space in text.
     """
-    height, width = stdscr.getmaxyx()
     # compute where to start vertically (center block)
     block_height = len(bio_lines)
     start_y = max(2, (height - block_height) // 2)
-
+    layout = []
     # split lines into words but maintain punctuation spacing
     for row_idx, line in enumerate(bio_lines):
         words = line.split(" ")
-        x = center_x_for_text(width, line)
-        y = start_y + row_idx
-        # walk across words, printing them with space
-        for w_idx, word in enumerate(words):
+        chunks = [(words[0], len(words[0]))] + [(" " + w, len(w)) for w in words[1:]]
+        layout.append((start_y + row_idx, center_x_for_text(width, line), chunks))
+    return layout
+
+
+def build_overlay_cache(layout, height, width):
+    """
+    Precompute the static bio overlay for the given layout_bio() result.
+    Returns one list of (y, x, char, attr) cells per color phase; phase p
+    is the base coloring shifted p slots through OVERLAY_ATTRS, so the main
+    loop only has to pick a phase instead of recomputing color pairs.
+    Cells falling off the screen (or a wide glyph's half) are dropped here,
+    once. A wide glyph's second cell holds "" so a row still joins to the
+    right text.
+    """
+    cells = []
+    idx = 0
+    for y, x, chunks in layout:
+        # keep clear of the bottom-right cell, like FrameBuffer.changed_runs()
+        limit = width if y < height - 1 else width - 1
+        for ch in "".join(text for text, _ in chunks):
+            w = char_width(ch)
+            if y < height and x + w <= limit:
+                cells.append((y, x, ch, idx))
+                if w == 2:
+                    cells.append((y, x + 1, "", idx))
+            x += w
+            idx = (idx + 1) & COLOR_MASK
+    return [
+        [(y, x, ch, OVERLAY_ATTRS[(idx + phase) & COLOR_MASK]) for y, x, ch, idx in cells]
+        for phase in range(COLOR_SLOTS)
+    ]
+
+
+def type_bio_overlay(stdscr, layout, color_idx, height, width, word_delay=0.28, char_delay=0.02):
+    """
+    Types the bio word-by-word at the positions given by layout_bio() for a
+    height x width screen. Each word cycles color, continuing from the running
+    counter color_idx; the advanced counter is returned. We overlay this on
+    top of the matrix.
+    """
+    for y, x, chunks in layout:
+        # walk across words; each one is a single write, with the space
+        # separating it from the previous word riding along
+        for chunk, word_len in chunks:
             # cycle color for each word
-            color_idx = next(color_cycle_iter)
-            # ensure valid color pair index (1..n where n=len(COLOR_CYCLE))
-            pair_num = (color_idx % len(COLOR_CYCLE)) + 1
-            # print word character-by-character for a type effect
-            for ch in word:
-                try:
-                    stdscr.addch(y, x, ch, curses.color_pair(pair_num) | curses.A_BOLD)
-                except curses.error:
-                    pass
-                x += 1
-                stdscr.refresh()
-                time.sleep(char_delay)
-            # print following space
-            try:
-                stdscr.addch(y, x, " ")
-            except curses.error:
-                pass
-            x += 1
+            attr = TEXT_ATTRS[color_idx & COLOR_MASK]
+            color_idx += 1
+            # a resize mid-typing invalidates height/width; main() will pick
+            # up the KEY_RESIZE and redraw, so just stop here
+            if curses.is_term_resized(height, width):
+                return color_idx
+            # clip to the screen by display width up front rather than catching
+            # curses.error (and keep clear of the bottom-right cell)
+            room = width - x - (1 if y == height - 1 else 0)
+            if 0 <= y < height and room > 0:
+                text = clip_to_width(chunk, room)
+                if text:
+                    stdscr.addstr(y, x, text, attr)
+            x += text_width(chunk)
             stdscr.refresh()
-            time.sleep(word_delay)
+            # keep the same overall pacing as typing char-by-char
+            time.sleep(char_delay * word_len + word_delay)
         # small pause after finishing a line
         time.sleep(0.25)
+    return color_idx
 
 
 def main(stdscr, args):
     # configuration tweaks
     curses.curs_set(0)  # hide cursor
-    stdscr.nodelay(True)  # make getch non-blocking
-    stdscr.timeout(0)
+    # getch doubles as the frame wait; the loop shortens it by each frame's render time
+    stdscr.timeout(int(FRAME_TIME * 1000))
 
     init_colors()
+    # flush curses' own startup output (screen clear etc.) before anything else
+    stdscr.refresh()
 
-    height, width = stdscr.getmaxyx()
-    # create columns across the full width with some spacing
-    columns = []
-    for x in range(0, width):
-        if random.random() < 0.12:  # about 12% of columns active -> density control
-            columns.append(MatrixColumn(x, height))
-
-    # ensure we have enough columns
-    if not columns:
-        for x in range(0, width, max(1, width // 40)):
-            columns.append(MatrixColumn(x, height))
+    # with --direct-tty, frames bypass curses and go to the terminal in one write
+    tty_fd = None
+    if args.direct_tty:
+        try:
+            tty_fd = os.open("/dev/tty", os.O_WRONLY)
+        except OSError:
+            pass
 
-    # a cycling iterator that returns indices for color pairs
-    color_idx_cycle = cycle(range(len(COLOR_CYCLE)))
+    # screen size is only re-read on KEY_RESIZE; everything sized to it is rebuilt then
+    height, width = stdscr.getmaxyx()
+    field = make_field(height, width, time.time())
+    buf = FrameBuffer(height, width)
+    # bio placement and static overlay cells for the current size
+    layout = layout_bio(args.lines, height, width)
+    overlay_phases = build_overlay_cache(layout, height, width)
+
+    # running word counter that picks the typed bio's color slot
+    color_idx = 0
     # We'll type the bio once, then keep it visible while matrix keeps raining.
     typed = False
     last_draw = 0.0
+    frame = 0
+    resize_pending = False
 
     # allow the bio to be typed repeatedly (set to False to type only once)
     repeat_bio = args.repeat
@@ -217,51 +456,76 @@ def main(stdscr, args):
 
     try:
         while True:
-            # handle input
+            # handle input (returns -1 once the frame wait times out)
             ch = stdscr.getch()
+            frame_start = time.perf_counter()
             if ch != -1:
                 if ch in (ord('q'), ord('Q')):
                     break
                 if ch == ord(' '):  # space toggles typing
                     do_type = True
+                if ch == curses.KEY_RESIZE:
+                    resize_pending = True
+            if resize_pending:
+                height, width = stdscr.getmaxyx()
+                field = make_field(height, width, time.time())
+                buf = FrameBuffer(height, width)
+                layout = layout_bio(args.lines, height, width)
+                overlay_phases = build_overlay_cache(layout, height, width)
+                resize_pending = False
+                if tty_fd is not None:
+                    # resizeterm() touched stdscr, so the next getch() would
+                    # clear the screen and repaint curses' stale contents over
+                    # our direct frame; let curses do that repaint now, empty
+                    stdscr.erase()
+                    stdscr.refresh()
 
-            # update columns
-            for col in columns:
-                col.step()
-
-            # draw background (clear then draw)
-            stdscr.erase()
-            draw_matrix(stdscr, columns)
+            # keep a faint static copy of bio (so it doesn't disappear if typed only once)
+            # The centered cells are cached; colors shift one step every OVERLAY_CYCLE_FRAMES
+            phase = (frame // OVERLAY_CYCLE_FRAMES) & COLOR_MASK
+            typing = do_type and (not typed or repeat_bio)
+            # advance and compose the frame; while typing, the rain shows without the overlay
+            compose_frame(time.time(), field, buf, [] if typing else overlay_phases[phase])
+            frame += 1
 
             # decide to type / overlay
-            if do_type and (not typed or repeat_bio):
-                type_bio_overlay(stdscr, args.lines, color_idx_cycle, word_delay=word_delay, char_delay=char_delay)
+            if typing:
+                # type over the current rain
+                if tty_fd is not None:
+                    # curses never saw the frames written directly; give it the
+                    # whole current frame and have it repaint from scratch
+                    buf.invalidate()
+                    buf.flush(stdscr)
+                    stdscr.redrawwin()
+                else:
+                    buf.flush(stdscr)
+                color_idx = type_bio_overlay(stdscr, layout, color_idx, height, width, word_delay=word_delay, char_delay=char_delay)
+                # typing drew behind the buffer's back
+                buf.invalidate()
                 typed = True
                 do_type = False if not repeat_bio else True
-
-            # keep a faint static copy of bio (so it doesn't disappear if typed only once)
-            # We'll rewrite full lines centered, but without typing animation, using a subtle color cycle
-            height, width = stdscr.getmaxyx()
-            block_height = len(args.lines)
-            start_y = max(2, (height - block_height) // 2)
-            # display static overlay (slight dim)
-            for row_idx, line in enumerate(args.lines):
-                x = center_x_for_text(width, line)
-                y = start_y + row_idx
-                # use cycling colors but not heavy bold
-                for i, ch in enumerate(line):
-                    try:
-                        pair_num = (next(color_idx_cycle) % len(COLOR_CYCLE)) + 1
-                        stdscr.addch(y, x + i, ch, curses.color_pair(pair_num))
-                    except curses.error:
-                        pass
-
-            stdscr.refresh()
-            time.sleep(0.03)  # main loop frame rate
+                if curses.is_term_resized(height, width):
+                    # typing stopped early on a resize; rebuild before drawing again
+                    resize_pending = True
+                # the static overlay comes back with the next frame
+                continue
+
+            if tty_fd is not None:
+                buf.flush_tty(tty_fd, stdscr.getyx())
+            else:
+                buf.flush(stdscr)
+                stdscr.refresh()
+            # let the next getch wait out what is left of the frame budget,
+            # so a keypress ends the wait right away
+            remaining = FRAME_TIME - (time.perf_counter() - frame_start)
+            stdscr.timeout(max(1, int(remaining * 1000)))
 
     except KeyboardInterrupt:
         # exit gracefully
         pass
+    finally:
+        if tty_fd is not None:
+            os.close(tty_fd)
 
 
 # -----------------------
@@ -273,6 +537,7 @@ def parse_args():
     p.add_argument("--autoplay", action="store_true", help="Start typing automatically on launch (default: press space to start).")
     p.add_argument("--word-delay", type=float, default=0.28, help="Delay (s) between words while typing.")
     p.add_argument("--char-delay", type=float, default=0.02, help="Delay (s) between characters while typing.")
+    p.add_argument("--direct-tty", action="store_true", help="Write frames straight to /dev/tty instead of through curses.")
     p.add_argument("--lines", nargs="*", help="Override bio lines (quoted), e.g. --lines \"Line 1\" \"Line 2\"")
     return p.parse_args()
 